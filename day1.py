@@ -8,39 +8,45 @@ DATA = "L5, R1, R4, L5, L4, R3, R1, L1, R4, R5, L1, L3, R4, L2, L4, R2, L4, L1,
 
 ORIENTATIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
 
-def day1a(data):
+# A motion is a rotation in quarter turns to the right followed by an offset,
+# both relative to the frame of the position and orientation it starts from.
+IDENTITY_MOTION = (0, (0, 0))
+
+def instruction_motion(instruction):
+    direction, distance = instruction
+    return (3, (-distance, 0)) if direction == 'L' else (1, (distance, 0))
+
+def rotate(offset, rotation):
+    for _ in range(rotation % 4):
+        offset = (offset[1], -offset[0])
+    return offset
+
+# Apply one motion and then another; composing motions is associative.
+def compose_motions(first, second):
+    rotation, offset = second
+    second_offset = rotate(offset, first[0])
+    return (
+        (first[0] + rotation) % 4,
+        (first[1][0] + second_offset[0], first[1][1] + second_offset[1]),
+    )
 
-    # Move from position and orientation using instructed direction and distance.
-    def move(state, instruction):
-        position, orientation = state
-        direction, distance = instruction
-        rotation = 3 if direction == 'L' else 1
-        new_orientation = ORIENTATIONS[(ORIENTATIONS.index(orientation) + rotation) % 4]
-        new_position = (
-            position[0] + new_orientation[0] * distance,
-            position[1] + new_orientation[1] * distance,
-        )
-        #print(position, orientation, direction, distance, new_position, new_orientation)
-        return new_position, new_orientation
 
-    # Parse serialized data into instructions.
-    instructions = (
+def day1a(data):
+
+    # Parse serialized data into motions.
+    motions = (
         Seq(data.split(', '))
             .map(lambda arg: (arg[0], int(arg[1:])))
-            .tolist()
+            .map(instruction_motion)
     )
 
-    # Initial position and orientation.
-    initial_state = ((0, 0), (0, 1))
-
-    # Apply instructions repeatedly to current position and orentation.
-    state = (
-        Seq(instructions)
-            .fold_left(initial_state, move)
+    # Compose all the motions starting from the origin facing north.
+    rotation, position = (
+        motions
+            .reduce_assoc(compose_motions, IDENTITY_MOTION)
     )
 
     # Print out distance in blocks from the origin.
-    position, orientation = state
     print('distance {0}'.format(abs(position[0]) + abs(position[1])))
 
 
@@ -54,14 +60,14 @@ def day1b(data):
         new_orientation = ORIENTATIONS[(ORIENTATIONS.index(orientation) + rotation) % 4]
         return (
             Seq(range(distance))
-                .fold_left((position, new_orientation, visited), step)
+                .fold_left((position, new_orientation, visited), step, preserve_stop=True)
         )
 
     def step(state, step_number):
         position, orientation, visited = state
         if position in visited:
             #print(position)
-            return state
+            return Seq.Stop(state)
         else:
             new_position = (
                 position[0] + orientation[0] * 1,
@@ -0,0 +1,295 @@
+"""
+grid
+"""
+
+from search import Search
+from seq import Seq
+
+ORIENTATIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+DIAGONALS = [(1, 1), (1, -1), (-1, -1), (-1, 1)]
+
+# Translation tables setting a bit, or set of bits, in every byte.
+OR_TABLES = [bytes(value | bit for value in range(256)) for bit in range(256)]
+
+
+class Direction(object):
+    """
+    Helpers for orientations in the order of ORIENTATIONS, turning right
+    """
+
+    @classmethod
+    def turn(cls, orientation, rotation):
+        """
+        Return the orientation after turning right 'rotation' quarter turns
+        """
+        return ORIENTATIONS[(ORIENTATIONS.index(orientation) + rotation) % 4]
+
+
+    @classmethod
+    def turn_left(cls, orientation):
+        """
+        Return the orientation after turning left
+        """
+        return cls.turn(orientation, 3)
+
+
+    @classmethod
+    def turn_right(cls, orientation):
+        """
+        Return the orientation after turning right
+        """
+        return cls.turn(orientation, 1)
+
+
+    @classmethod
+    def step(cls, position, orientation, distance=1):
+        """
+        Return the position after moving 'distance' cells in an orientation
+        """
+        return (
+            position[0] + orientation[0] * distance,
+            position[1] + orientation[1] * distance,
+        )
+
+
+class Grid(object):
+    """
+    Two dimensional grid of byte-sized cells indexed by position tuples
+
+    Cells start as zero and each one can hold a value from 0 to 255 or a
+    set of bit flags.  Lines along an orientation are read and written
+    with a slice of the underlying storage rather than cell by cell.
+    Subclasses provide indexing by position, 'in' for positions within the
+    grid and the line methods.
+    """
+
+    def mark(self, position, bit=1):
+        """
+        Set a bit in the cell at a position and return whether it was already set
+        """
+        value = self[position]
+        self[position] = value | bit
+        return bool(value & bit)
+
+
+    def is_marked(self, position, bit=1):
+        """
+        Whether a bit is set in the cell at a position
+        """
+        return bool(self[position] & bit)
+
+
+    def neighbors(self, position, diagonal=False):
+        """
+        Return a sequence of the positions adjacent to a position within the grid
+
+        If diagonal is true, include diagonally adjacent positions.
+        """
+        orientations = ORIENTATIONS + DIAGONALS if diagonal else ORIENTATIONS
+        return (
+            Seq(orientations)
+                .map(lambda orientation: Direction.step(position, orientation))
+                .filter(self.__contains__)
+        )
+
+
+    def flood_fill(self, start, value, diagonal=False):
+        """
+        Set the region of cells connected to start with the same value as start to value
+
+        Return the number of cells filled.  The region must be bounded.
+        """
+        original = self[start]
+        if original == value:
+            return 0
+
+        def neighbors(position):
+            return self.neighbors(position, diagonal).filter(lambda neighbor: self[neighbor] == original)
+
+        def fill(node):
+            self[node.state] = value
+
+        return Search.bfs(start, neighbors).map(fill).count()
+
+
+class DenseGrid(Grid):
+    """
+    Bounded grid stored as a single bytearray in row-major order
+    """
+
+    def __init__(self, width, height, origin=(0, 0)):
+        """
+        Construct a grid of width by height cells whose lowest corner is at origin
+        """
+        self.width = width
+        self.height = height
+        self.origin = origin
+        self.cells = bytearray(width * height)
+
+    def __getitem__(self, position):
+        return self.cells[self._index(position)]
+
+    def __setitem__(self, position, value):
+        self.cells[self._index(position)] = value
+
+    def __contains__(self, position):
+        x, y = position[0] - self.origin[0], position[1] - self.origin[1]
+        return 0 <= x < self.width and 0 <= y < self.height
+
+
+    def line(self, start, orientation, distance):
+        """
+        Return a bytearray of the 'distance' cells from start along an orientation
+        """
+        return self.cells[self._slice(start, orientation, distance)]
+
+
+    def draw_line(self, start, orientation, distance, value=1):
+        """
+        Set the 'distance' cells from start along an orientation to value
+        """
+        self.cells[self._slice(start, orientation, distance)] = bytes([value]) * distance
+
+
+    def mark_line(self, start, orientation, distance, bit=1):
+        """
+        Set a bit in the 'distance' cells from start along an orientation
+
+        Return a bytearray of the cells before they were marked.
+        """
+        cells = self._slice(start, orientation, distance)
+        previous = self.cells[cells]
+        self.cells[cells] = previous.translate(OR_TABLES[bit])
+        return previous
+
+
+    def positions(self, predicate=None):
+        """
+        Return a sequence of the positions in the grid in row-major order
+
+        If predicate is provided, only include positions whose values satisfy it.
+        """
+        positions = (
+            Seq.from_range(self.height)
+                .map_many(lambda y: ((self.origin[0] + x, self.origin[1] + y) for x in range(self.width)))
+        )
+        if predicate is None:
+            return positions
+        return positions.filter(lambda position: predicate(self[position]))
+
+
+    def _index(self, position):
+        if position not in self:
+            raise IndexError("position {0} outside grid".format(position))
+        return (position[1] - self.origin[1]) * self.width + position[0] - self.origin[0]
+
+
+    def _slice(self, start, orientation, distance):
+        if distance <= 0:
+            return slice(0, 0)
+        self._index(Direction.step(start, orientation, distance - 1))
+        first = self._index(start)
+        if distance == 1:
+            return slice(first, first + 1)
+        stride = orientation[0] + orientation[1] * self.width
+        stop = first + stride * distance
+        return slice(first, stop if stop >= 0 else None, stride)
+
+
+class SparseGrid(Grid):
+    """
+    Unbounded grid stored as dense chunks allocated as they are written
+    """
+
+    def __init__(self, chunk_size=64):
+        """
+        Construct an empty grid allocating square chunks of chunk_size cells on a side
+        """
+        self.chunk_size = chunk_size
+        self.chunks = {}
+
+    def __getitem__(self, position):
+        chunk = self._chunk(position, False)
+        return 0 if chunk is None else chunk[position]
+
+    def __setitem__(self, position, value):
+        self._chunk(position, True)[position] = value
+
+    def __contains__(self, position):
+        return True
+
+
+    def line(self, start, orientation, distance):
+        """
+        Return a bytearray of the 'distance' cells from start along an orientation
+        """
+        cells = bytearray()
+        for chunk, position, count in self._pieces(start, orientation, distance, False):
+            if chunk is None:
+                cells.extend(bytes(count))
+            else:
+                cells.extend(chunk.line(position, orientation, count))
+        return cells
+
+
+    def draw_line(self, start, orientation, distance, value=1):
+        """
+        Set the 'distance' cells from start along an orientation to value
+        """
+        for chunk, position, count in self._pieces(start, orientation, distance, True):
+            chunk.draw_line(position, orientation, count, value)
+
+
+    def mark_line(self, start, orientation, distance, bit=1):
+        """
+        Set a bit in the 'distance' cells from start along an orientation
+
+        Return a bytearray of the cells before they were marked.
+        """
+        previous = bytearray()
+        for chunk, position, count in self._pieces(start, orientation, distance, True):
+            previous.extend(chunk.mark_line(position, orientation, count, bit))
+        return previous
+
+
+    def positions(self, predicate=None):
+        """
+        Return a sequence of the positions in allocated chunks
+
+        If predicate is provided, only include positions whose values satisfy it.
+        """
+        return Seq(self.chunks.values()).map_many(lambda chunk: chunk.positions(predicate))
+
+
+    def _chunk(self, position, create):
+        key = (position[0] // self.chunk_size, position[1] // self.chunk_size)
+        chunk = self.chunks.get(key)
+        if chunk is None and create:
+            origin = (key[0] * self.chunk_size, key[1] * self.chunk_size)
+            chunk = self.chunks[key] = DenseGrid(self.chunk_size, self.chunk_size, origin)
+        return chunk
+
+
+    def _pieces(self, start, orientation, distance, create):
+        """
+        Split a line into the pieces falling within each chunk
+
+        Produce tuples of chunk, or None if it is not allocated, starting
+        position and number of cells.
+        """
+        position = start
+        while distance > 0:
+            offset = (
+                position[0] % self.chunk_size,
+                position[1] % self.chunk_size,
+            )
+            count = distance
+            for axis in (0, 1):
+                if orientation[axis] > 0:
+                    count = min(count, self.chunk_size - offset[axis])
+                elif orientation[axis] < 0:
+                    count = min(count, offset[axis] + 1)
+            yield self._chunk(position, create), position, count
+            position = Direction.step(position, orientation, count)
+            distance -= count
@@ -0,0 +1,196 @@
+"""
+search
+"""
+
+import collections
+import heapq
+import itertools
+
+from seq import Op, Seq
+
+
+class Node(object):
+    """
+    A state visited by a search along with its cost and the node it was reached from
+    """
+
+    __slots__ = ('state', 'cost', 'parent')
+
+    def __init__(self, state, cost=0, parent=None):
+        """
+        Construct a node for a state reached at cost from a parent node
+        """
+        self.state = state
+        self.cost = cost
+        self.parent = parent
+
+    def __repr__(self):
+        return 'Node({0!r}, {1!r})'.format(self.state, self.cost)
+
+    def path(self):
+        """
+        Return the list of states from the start of the search to this node
+        """
+        states = []
+        node = self
+        while node is not None:
+            states.append(node.state)
+            node = node.parent
+        states.reverse()
+        return states
+
+
+class Search(object):
+    """
+    State-space searches producing visited nodes lazily as sequences
+
+    Each search stops once the goal state, if any, has been produced, and
+    since the result is a sequence, callers can also stop early with
+    methods such as 'first' or 'take_while'.  If key is provided, use it
+    to map states to the compact hashable values held in the visited set.
+    """
+
+    @classmethod
+    def bfs(cls, start, neighbors, goal=None, key=None, bidirectional=False, reverse_neighbors=None):
+        """
+        Breadth-first search from start where neighbors maps a state to its neighboring states
+
+        Every step costs one.  If bidirectional is true, also search backwards
+        from goal using reverse_neighbors, or neighbors if it is not provided,
+        and produce the forward nodes followed by the goal node once the two
+        searches meet.
+        """
+        key = Op.identity if key is None else key
+        if bidirectional:
+            if goal is None:
+                raise ValueError("bidirectional search requires a goal")
+            reverse_neighbors = neighbors if reverse_neighbors is None else reverse_neighbors
+            return Seq(cls._bidirectional_bfs(start, goal, neighbors, reverse_neighbors, key))
+        return Seq(cls._bfs(start, neighbors, goal, key))
+
+
+    @classmethod
+    def dijkstra(cls, start, neighbors, goal=None, key=None):
+        """
+        Lowest-cost-first search from start where neighbors maps a state to pairs of neighboring state and step cost
+
+        Nodes are produced in order of increasing cost, each state once.
+        """
+        return cls.astar(start, neighbors, Op.value(0), goal, key)
+
+
+    @classmethod
+    def astar(cls, start, neighbors, heuristic, goal=None, key=None):
+        """
+        A* search from start where neighbors maps a state to pairs of neighboring state and step cost
+
+        The heuristic estimates the remaining cost from a state to the goal
+        and must never overestimate it for the goal to be reached at the
+        lowest cost.  If the heuristic is not also consistent, a state is
+        produced again whenever a cheaper path to it is found.
+        """
+        key = Op.identity if key is None else key
+        return Seq(cls._astar(start, neighbors, heuristic, goal, key))
+
+
+    @classmethod
+    def _bfs(cls, start, neighbors, goal, key):
+        goal_key = None if goal is None else key(goal)
+        node = Node(start)
+        yield node
+        if goal is not None and key(start) == goal_key:
+            return
+        visited = set([key(start)])
+        frontier = collections.deque([node])
+        while frontier:
+            node = frontier.popleft()
+            for state in neighbors(node.state):
+                state_key = key(state)
+                if state_key in visited:
+                    continue
+                visited.add(state_key)
+                child = Node(state, node.cost + 1, node)
+                yield child
+                if goal is not None and state_key == goal_key:
+                    return
+                frontier.append(child)
+
+
+    @classmethod
+    def _bidirectional_bfs(cls, start, goal, neighbors, reverse_neighbors, key):
+        forward_node, backward_node = Node(start), Node(goal)
+        yield forward_node
+        if key(start) == key(goal):
+            return
+        forward = {key(start): forward_node}
+        backward = {key(goal): backward_node}
+        forward_frontier, backward_frontier = [forward_node], [backward_node]
+        meeting = None
+        while meeting is None and forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                next_frontier = []
+                for node in forward_frontier:
+                    for state in neighbors(node.state):
+                        state_key = key(state)
+                        if state_key in forward:
+                            continue
+                        child = Node(state, node.cost + 1, node)
+                        forward[state_key] = child
+                        next_frontier.append(child)
+                        if state_key in backward:
+                            meeting = state_key
+                            break
+                        yield child
+                    if meeting is not None:
+                        break
+                forward_frontier = next_frontier
+            else:
+                next_frontier = []
+                for node in backward_frontier:
+                    for state in reverse_neighbors(node.state):
+                        state_key = key(state)
+                        if state_key in backward:
+                            continue
+                        child = Node(state, node.cost + 1, node)
+                        backward[state_key] = child
+                        next_frontier.append(child)
+                        if state_key in forward:
+                            meeting = state_key
+                            break
+                    if meeting is not None:
+                        break
+                backward_frontier = next_frontier
+        if meeting is None:
+            return
+
+        # Join the backward chain from the meeting state onto the forward one.
+        node = forward[meeting]
+        backward_node = backward[meeting].parent
+        while backward_node is not None:
+            node = Node(backward_node.state, node.cost + 1, node)
+            backward_node = backward_node.parent
+        yield node
+
+
+    @classmethod
+    def _astar(cls, start, neighbors, heuristic, goal, key):
+        goal_key = None if goal is None else key(goal)
+        counter = itertools.count()
+        frontier = [(heuristic(start), next(counter), Node(start))]
+        best = {key(start): 0}
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            node_key = key(node.state)
+            if node.cost > best[node_key]:
+                continue
+            yield node
+            if goal is not None and node_key == goal_key:
+                return
+            for state, cost in neighbors(node.state):
+                state_key = key(state)
+                child_cost = node.cost + cost
+                if state_key in best and best[state_key] <= child_cost:
+                    continue
+                best[state_key] = child_cost
+                child = Node(state, child_cost, node)
+                heapq.heappush(frontier, (child_cost + heuristic(state), next(counter), child))
@@ -8,6 +8,9 @@
 import operator
 import functools
 import itertools
+import collections
+import concurrent.futures
+import os
 
 
 class Op(object):
@@ -234,6 +237,20 @@ class Seq(object):
     empty = None
 
 
+    class Stop(object):
+        """
+        Result of a fold function that stops the fold with a value
+        """
+
+        __slots__ = ('value',)
+
+        def __init__(self, value):
+            """
+            Construct a stopped result of value
+            """
+            self.value = value
+
+
     @classmethod
     def from_items(cls, *args):
         """
@@ -279,6 +296,64 @@ class Seq(object):
         return cls(itertools.count(start, step))
 
 
+    @classmethod
+    def iterate(cls, function, start):
+        """
+        Return an infinite sequence of repeated applications of function
+
+        The sequence starts with start followed by function(start) and so on.
+        """
+
+        def inner(item):
+            while True:
+                yield item
+                item = function(item)
+
+        return cls(inner(start))
+
+
+    @classmethod
+    def find_cycle(cls, function, start, key=None):
+        """
+        Find the cycle reached by repeatedly applying function to start
+
+        Return a tuple of the length of the prefix before the cycle and the
+        period of the cycle.  States are indexed by hash if they are
+        hashable, or by key if it is provided, and otherwise Brent's
+        algorithm is used in constant memory.  The states must eventually
+        repeat.
+        """
+        if cls._is_indexable(start, key):
+            _, prefix, period = cls._find_cycle_indexed(function, start, key, None)
+        else:
+            prefix, period, _ = cls._find_cycle_brent(function, start, None)
+        return prefix, period
+
+
+    @classmethod
+    def nth_iterate(cls, function, start, count, key=None):
+        """
+        Return the result of applying function to start 'count' times
+
+        Once the states start repeating, use the cycle to skip ahead instead
+        of stepping through the remaining applications.  The search for a
+        cycle never goes past 'count' applications.
+        """
+        if cls._is_indexable(start, key):
+            states, prefix, period = cls._find_cycle_indexed(function, start, key, count)
+            if count >= prefix:
+                count = prefix + (count - prefix) % period
+            return states[count]
+        if count == 0:
+            return start
+        prefix, period, state = cls._find_cycle_brent(function, start, count)
+        if period is None:
+            return state
+        if count >= prefix:
+            count = prefix + (count - prefix) % period
+        return cls.iterate(function, start).drop(count).first()
+
+
     @classmethod
     def prepend(cls, item, sequence):
         """
@@ -412,29 +487,144 @@ class Seq(object):
         return any(self._iterable_or_map(predicate))
 
 
-    def fold(self, function):
+    def fold(self, function, preserve_stop=False):
         """
         Apply function to pairs of elements in a sequence
+
+        If function returns a Seq.Stop, stop consuming the sequence and
+        return its value, or the Seq.Stop itself if preserve_stop is true so
+        that an enclosing fold stops too.
         """
-        return functools.reduce(function, self._iterable)
+        iterator = iter(self._iterable)
+        for start in iterator:
+            return Seq._fold(function, start, iterator, preserve_stop)
+        raise TypeError("fold of empty sequence with no start value")
 
 
-    def fold_left(self, start, function):
+    def fold_left(self, start, function, preserve_stop=False):
         """
         Apply function to pairs of elements in a sequence from the left
 
-        Return 'start' if the sequence is empty.
+        Return 'start' if the sequence is empty.  A Seq.Stop returned by
+        function stops the fold as for 'fold'.
         """
-        return functools.reduce(function, self._iterable, start)
+        return Seq._fold(function, start, self._iterable, preserve_stop)
 
 
-    def fold_right(self, start, function):
+    def fold_right(self, start, function, preserve_stop=False):
         """
         Apply function to pairs of elements in a sequence from the right
 
-        Return 'start' if the sequence is empty.
+        Return 'start' if the sequence is empty.  A Seq.Stop returned by
+        function stops the fold as for 'fold'.
         """
-        return functools.reduce(Op.swap(function), reversed(list(self._iterable)), start)
+        return Seq._fold(Op.swap(function), start, reversed(list(self._iterable)), preserve_stop)
+
+
+    def fold_until(self, start, function, predicate):
+        """
+        Apply function to pairs of elements in a sequence from the left until predicate is true
+
+        Stop consuming the sequence and return the first result, starting
+        with 'start', that satisfies predicate.  A Seq.Stop returned by
+        function stops the fold without consulting predicate.
+        """
+        if predicate(start):
+            return start
+
+        def inner(lhs, rhs):
+            result = function(lhs, rhs)
+            if isinstance(result, Seq.Stop):
+                return result
+            return Seq.Stop(result) if predicate(result) else result
+
+        return self.fold_left(start, inner)
+
+
+    def scan(self, start, function):
+        """
+        Produce 'start' followed by the results of applying function to pairs of elements from the left
+
+        If function returns a Seq.Stop, produce its value and stop consuming
+        the sequence.
+        """
+
+        def inner(iterable):
+            result = start
+            yield result
+            for item in iterable:
+                result = function(result, item)
+                if isinstance(result, Seq.Stop):
+                    yield result.value
+                    return
+                yield result
+
+        return Seq(inner(self._iterable))
+
+
+    def reduce_assoc(self, function, identity, workers=None, chunk_size=65536):
+        """
+        Apply an associative function to pairs of elements in a sequence in parallel
+
+        The sequence is split into chunks of 'chunk_size' items which are
+        reduced in a pool of 'workers' processes, defaulting to one per
+        core, and the results are combined in a tree.  The function must be
+        picklable.  A sequence that fits in one chunk is reduced in this
+        process.  Return 'identity' if the sequence is empty.
+        """
+        chunks = Seq._chunks(self._iterable, chunk_size)
+        first = next(chunks, None)
+        if first is None:
+            return identity
+        if len(first) < chunk_size:
+            return functools.reduce(function, first, identity)
+        reduce_chunk = functools.partial(Seq._reduce_chunk, function, identity)
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            results = list(Seq._map_bounded(executor, workers, reduce_chunk, itertools.chain([first], chunks)))
+        return Seq._reduce_tree(function, results)
+
+
+    def prefix_scan(self, function, workers=None, chunk_size=65536):
+        """
+        Produce the running results of an associative function applied to a sequence in parallel
+
+        The chunks of 'chunk_size' items are read a window of a few chunks
+        per worker at a time.  The first pass reduces the chunks of a window
+        in a pool of 'workers' processes and the second pass scans each
+        chunk starting from the combined result of the chunks before it, so
+        the results are produced lazily in bounded memory.  The function
+        must be picklable.  A sequence that fits in one chunk is scanned in
+        this process.
+        """
+
+        def inner(chunks):
+            first = next(chunks, None)
+            if first is None:
+                return
+            if len(first) < chunk_size:
+                for item in Seq._scan_chunk(function, (), first):
+                    yield item
+                return
+            chunks = itertools.chain([first], chunks)
+            window = 2 * (workers or os.cpu_count() or 1)
+            reduce_chunk = functools.partial(functools.reduce, function)
+            scan_chunk = functools.partial(Seq._scan_chunk, function)
+            offset = ()
+            with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+                while True:
+                    window_chunks = list(itertools.islice(chunks, window))
+                    if not window_chunks:
+                        return
+                    offsets = [offset]
+                    for total in executor.map(reduce_chunk, window_chunks[:-1]):
+                        offset = (total,) if not offset else (function(offset[0], total),)
+                        offsets.append(offset)
+                    for results in executor.map(scan_chunk, offsets, window_chunks):
+                        for item in results:
+                            yield item
+                    offset = (results[-1],)
+
+        return Seq(inner(Seq._chunks(self._iterable, chunk_size)))
 
 
     def items_of(self, dict):
@@ -650,6 +840,183 @@ class Seq(object):
         return Seq(inner(self._iterable))
 
 
+    def union(self, other):
+        """
+        Produce a sequence of distinct elements from a sequence and another
+        """
+        return self.union_by(other, Op.identity)
+
+
+    def union_by(self, other, key):
+        """
+        Produce a sequence of elements from a sequence and another with distinct keys
+        """
+
+        def inner(iterable):
+            keys = set()
+            for item in iterable:
+                item_key = key(item)
+                if item_key not in keys:
+                    yield item
+                    keys.add(item_key)
+
+        return Seq(inner(itertools.chain(self._iterable, other)))
+
+
+    def intersect(self, other):
+        """
+        Produce a sequence of distinct elements common to a sequence and another
+        """
+        return self.intersect_by(other, Op.identity)
+
+
+    def intersect_by(self, other, key):
+        """
+        Produce a sequence of elements whose keys are common to a sequence and another
+
+        Only the smaller side is hashed when both sizes are known and the
+        other is streamed.  Items are produced in the order of the sequence
+        either way.
+        """
+
+        def inner_hash_self(iterable):
+            items = Seq._index_by(iterable, key)
+            matched = set()
+            for item in other:
+                item_key = key(item)
+                if item_key in items:
+                    matched.add(item_key)
+                    if len(matched) == len(items):
+                        break
+            for item_key, item in items.items():
+                if item_key in matched:
+                    yield item
+
+        def inner_hash_other(iterable):
+            keys = set(map(key, other))
+            for item in iterable:
+                item_key = key(item)
+                if item_key in keys:
+                    yield item
+                    keys.remove(item_key)
+                    if not keys:
+                        return
+
+        if Seq._is_smaller(self._iterable, other):
+            return Seq(inner_hash_self(self._iterable))
+        return Seq(inner_hash_other(self._iterable))
+
+
+    def except_(self, other):
+        """
+        Produce a sequence of distinct elements of a sequence not in another
+        """
+        return self.except_by(other, Op.identity)
+
+
+    def except_by(self, other, key):
+        """
+        Produce a sequence of elements of a sequence whose keys are not in another
+
+        Only the smaller side is hashed when both sizes are known and the
+        other is streamed.
+        """
+
+        def inner_hash_other(iterable):
+            keys = set(map(key, other))
+            for item in iterable:
+                item_key = key(item)
+                if item_key not in keys:
+                    yield item
+                    keys.add(item_key)
+
+        def inner_hash_self(iterable):
+            items = Seq._index_by(iterable, key)
+            for item in other:
+                items.pop(key(item), None)
+                if not items:
+                    return
+            for item in items.values():
+                yield item
+
+        if Seq._is_smaller(self._iterable, other):
+            return Seq(inner_hash_self(self._iterable))
+        return Seq(inner_hash_other(self._iterable))
+
+
+    def symmetric_difference(self, other):
+        """
+        Produce a sequence of distinct elements in either a sequence or another but not both
+        """
+        return self.symmetric_difference_by(other, Op.identity)
+
+
+    def symmetric_difference_by(self, other, key):
+        """
+        Produce a sequence of elements whose keys are in either a sequence or another but not both
+
+        Unmatched items of the sequence are produced first in order,
+        followed by unmatched items of the other in order.  Every key of
+        both sides is held in memory since both sides must be made distinct.
+        """
+
+        def inner(iterable):
+            items = Seq._index_by(other, key)
+            matched = set()
+            for item in iterable:
+                item_key = key(item)
+                if item_key in items:
+                    del items[item_key]
+                    matched.add(item_key)
+                elif item_key not in matched:
+                    yield item
+                    matched.add(item_key)
+            for item in items.values():
+                yield item
+
+        return Seq(inner(self._iterable))
+
+
+    def union_sorted(self, other, key=None):
+        """
+        Produce a sequence of distinct elements from a sorted sequence and another sorted sequence
+
+        Both sequences must be sorted by key.  The result is sorted and is
+        produced by merging in constant memory.
+        """
+        return Seq(Seq._merge_sorted(self._iterable, other, key, True, True, True))
+
+
+    def intersect_sorted(self, other, key=None):
+        """
+        Produce a sequence of distinct elements common to a sorted sequence and another sorted sequence
+
+        Both sequences must be sorted by key.  The result is sorted and is
+        produced by merging in constant memory.
+        """
+        return Seq(Seq._merge_sorted(self._iterable, other, key, False, True, False))
+
+
+    def except_sorted(self, other, key=None):
+        """
+        Produce a sequence of distinct elements of a sorted sequence not in another sorted sequence
+
+        Both sequences must be sorted by key.  The result is sorted and is
+        produced by merging in constant memory.
+        """
+        return Seq(Seq._merge_sorted(self._iterable, other, key, True, False, False))
+
+
+    def symmetric_difference_sorted(self, other, key=None):
+        """
+        Produce a sequence of distinct elements in either of two sorted sequences but not both
+
+        Both sequences must be sorted by key.  The result is sorted and is
+        produced by merging in constant memory.
+        """
+        return Seq(Seq._merge_sorted(self._iterable, other, key, True, False, True))
+
+
     def totuple(self):
         """
         Convert a sequence to a tuple
@@ -699,6 +1066,253 @@ class Seq(object):
         return Seq(list(self._iterable))
 
 
+    def batched(self, count, factory=list):
+        """
+        Group items from a sequence into batches of up to 'count' items
+
+        The batches are built with factory, e.g. a list, an array or a NumPy
+        array constructor, and are processed as a whole by the batch methods
+        of the resulting sequence.
+        """
+        if count < 1:
+            raise ValueError("count must be at least one")
+
+        def inner(iterator):
+            while True:
+                batch = list(itertools.islice(iterator, count))
+                if not batch:
+                    return
+                yield batch if factory is list else factory(batch)
+
+        return BatchedSeq(inner(iter(self._iterable)), factory)
+
+
+    @staticmethod
+    def _find_cycle_indexed(function, start, key, limit):
+        """
+        Find a cycle by indexing states by hash
+
+        Return a tuple of the states seen, the prefix length and the period.
+        If 'limit' applications are reached before a state repeats, return
+        the states seen with a prefix of 'limit' and a period of one.
+        """
+        key = Op.identity if key is None else key
+        states = []
+        indices = {}
+        item = start
+        while True:
+            item_key = key(item)
+            if item_key in indices:
+                index = indices[item_key]
+                return states, index, len(states) - index
+            indices[item_key] = len(states)
+            states.append(item)
+            if limit is not None and len(states) > limit:
+                return states, limit, 1
+            item = function(item)
+
+
+    @staticmethod
+    def _is_indexable(start, key):
+        """
+        Whether states can be indexed by hash, judging by the starting state
+        """
+        if key is not None:
+            return True
+        try:
+            hash(start)
+        except TypeError:
+            return False
+        return True
+
+
+    @staticmethod
+    def _find_cycle_brent(function, start, limit):
+        """
+        Find a cycle using Brent's algorithm
+
+        Return a tuple of the prefix length, the period and None.  If
+        'limit' applications are reached before a state repeats, return a
+        tuple of the limit, None and the state reached instead.
+        """
+        power = period = 1
+        steps = 1
+        tortoise, hare = start, function(start)
+        while tortoise != hare:
+            if limit is not None and steps >= limit:
+                return limit, None, hare
+            if power == period:
+                tortoise = hare
+                power *= 2
+                period = 0
+            hare = function(hare)
+            steps += 1
+            period += 1
+        prefix = 0
+        tortoise = hare = start
+        for _ in range(period):
+            hare = function(hare)
+        while tortoise != hare:
+            tortoise, hare = function(tortoise), function(hare)
+            prefix += 1
+        return prefix, period, None
+
+
+    @staticmethod
+    def _fold(function, start, iterable, preserve_stop):
+        """
+        Apply function to pairs of elements from the left stopping at a Seq.Stop
+        """
+        result = start
+        for item in iterable:
+            result = function(result, item)
+            if isinstance(result, Seq.Stop):
+                return result if preserve_stop else result.value
+        return result
+
+
+    @staticmethod
+    def _chunks(iterable, chunk_size):
+        """
+        Split an iterable into lists of up to 'chunk_size' items
+        """
+        iterator = iter(iterable)
+        while True:
+            chunk = list(itertools.islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+
+    @staticmethod
+    def _reduce_chunk(function, identity, chunk):
+        """
+        Reduce a chunk starting from the identity
+        """
+        return functools.reduce(function, chunk, identity)
+
+
+    @staticmethod
+    def _scan_chunk(function, offset, chunk):
+        """
+        Return the running results of function over a chunk
+
+        The offset is an empty tuple or a tuple of the result to start from.
+        """
+        results = []
+        iterator = iter(chunk)
+        if offset:
+            total = offset[0]
+        elif chunk:
+            total = next(iterator)
+            results.append(total)
+        for item in iterator:
+            total = function(total, item)
+            results.append(total)
+        return results
+
+
+    @staticmethod
+    def _map_bounded(executor, workers, function, *iterables):
+        """
+        Map function over iterables in an executor in order
+
+        Only a few tasks per worker are submitted ahead of the results being
+        consumed so that the iterables are not read all at once.
+        """
+        window = 2 * (workers or os.cpu_count() or 1)
+        futures = collections.deque()
+        for args in zip(*iterables):
+            futures.append(executor.submit(function, *args))
+            if len(futures) >= window:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+    @staticmethod
+    def _reduce_tree(function, items):
+        """
+        Combine items pairwise in a balanced tree preserving their order
+        """
+        while len(items) > 1:
+            pairs = range(0, len(items) - 1, 2)
+            combined = [function(items[i], items[i + 1]) for i in pairs]
+            if len(items) % 2:
+                combined.append(items[-1])
+            items = combined
+        return items[0]
+
+
+    @staticmethod
+    def _is_smaller(lhs, rhs):
+        """
+        Whether one iterable is known to be strictly smaller than another
+
+        The sizes of sequences are those of the iterables they wrap.
+        """
+        while isinstance(lhs, Seq):
+            lhs = lhs._iterable
+        while isinstance(rhs, Seq):
+            rhs = rhs._iterable
+        try:
+            return len(lhs) < len(rhs)
+        except TypeError:
+            return False
+
+
+    @staticmethod
+    def _index_by(iterable, key):
+        """
+        Map the distinct keys of an iterable to their first items in order
+        """
+        items = {}
+        for item in iterable:
+            items.setdefault(key(item), item)
+        return items
+
+
+    @staticmethod
+    def _merge_sorted(lhs, rhs, key, left_only, both, right_only):
+        """
+        Merge two iterables sorted by key producing items with distinct keys
+
+        Items whose key is only on the left, in both or only on the right
+        are produced according to the corresponding flags.
+        """
+
+        def keyed(iterable):
+            previous = end
+            for item in iterable:
+                item_key = item if key is None else key(item)
+                if previous is end or previous != item_key:
+                    yield item_key, item
+                    previous = item_key
+
+        end = object()
+        lhs, rhs = keyed(lhs), keyed(rhs)
+        left, right = next(lhs, end), next(rhs, end)
+        while left is not end and right is not end:
+            if left[0] < right[0]:
+                if left_only:
+                    yield left[1]
+                left = next(lhs, end)
+            elif right[0] < left[0]:
+                if right_only:
+                    yield right[1]
+                right = next(rhs, end)
+            else:
+                if both:
+                    yield left[1]
+                left, right = next(lhs, end), next(rhs, end)
+        while left_only and left is not end:
+            yield left[1]
+            left = next(lhs, end)
+        while right_only and right is not end:
+            yield right[1]
+            right = next(rhs, end)
+
+
     def _iterable_or_map(self, function):
         if function is None:
             return self._iterable
@@ -713,4 +1327,112 @@ class Seq(object):
             return filter(predicate, self._iterable)
 
 
+class BatchedSeq(Seq):
+    """
+    Sequence of items processed in batches to amortize per-item call overhead
+
+    Iterating a batched sequence or using any method not specific to batches
+    produces the individual items.  Like any sequence over an iterator, it
+    can only be consumed once: the item and batch methods share the same
+    batches, so after reading part of a batch item by item, a batch method
+    continues from the next batch.
+    """
+
+    def __init__(self, batches, factory=list):
+        """
+        Construct a batched sequence from an iterable of batches built with factory
+        """
+        Seq.__init__(self, itertools.chain.from_iterable(batches))
+        self._batches = batches
+        self._factory = factory
+
+
+    def map_batch(self, function):
+        """
+        Map function over batches from a sequence
+
+        The function receives a whole batch and returns the mapped batch.
+        """
+        return BatchedSeq(map(function, self._batches), self._factory)
+
+
+    def filter_batch(self, predicate):
+        """
+        Filter items from a sequence a batch at a time
+
+        The predicate receives a whole batch and returns a batch of flags,
+        one for each item, indicating which items to accept.  Batches that
+        support indexing by a mask, e.g. NumPy arrays, are indexed directly
+        and others have the accepted items rebuilt into a batch with the
+        factory of the sequence.
+        """
+
+        def function(batch):
+            mask = predicate(batch)
+            try:
+                return batch[mask]
+            except TypeError:
+                pass
+            items = list(itertools.compress(batch, mask))
+            return items if self._factory is list else self._factory(items)
+
+        return BatchedSeq(map(function, self._batches), self._factory)
+
+
+    def unbatch(self):
+        """
+        Convert a batched sequence back to a sequence of items
+        """
+        return Seq(self._iterable)
+
+
+    def count(self, predicate=None):
+        """
+        Count the number of items in a sequence
+
+        If function is provided, use it as a filtering predicate.
+        """
+        if predicate is None:
+            return sum(map(len, self._batches))
+        return sum(sum(1 for i in filter(predicate, batch)) for batch in self._batches)
+
+
+    def sum(self, function=None):
+        """
+        Sum items in a sequence
+
+        If function is provided, use it to map items to sum over.
+        """
+        if function is None:
+            return sum(map(BatchedSeq._sum_batch, self._batches))
+        return sum(sum(map(function, batch)) for batch in self._batches)
+
+
+    def totuple(self):
+        """
+        Convert a sequence to a tuple
+        """
+        return tuple(self.tolist())
+
+
+    def tolist(self):
+        """
+        Convert a sequence to a list
+        """
+        items = []
+        for batch in self._batches:
+            items.extend(batch)
+        return items
+
+
+    @staticmethod
+    def _sum_batch(batch):
+        """
+        Sum a batch using its own sum method if it has one, e.g. a NumPy array
+        """
+        if hasattr(batch, 'sum'):
+            return batch.sum()
+        return sum(batch)
+
+
 Seq.empty = Seq([])